@@ -1,18 +1,27 @@
 import os
-import json
+import sys
+import orjson
 import time
+import itertools
+from collections import deque
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Iterator
 import readline
 
 from rag import MentalHealthRAG
 
+# Oldest messages are dropped once a conversation grows past this
+MAX_HISTORY_MESSAGES = 200
+
+# Past twice this many messages, the oldest MAX_VERBATIM are folded into a summary
+MAX_VERBATIM = 20
+
 class MentalHealthAgent:
 
     def __init__(self, groq_api_key: str):
         self.groq_api_key = groq_api_key
         self.rag_system = MentalHealthRAG(groq_api_key)
-        self.conversation_history = []
+        self.conversation_history = deque(maxlen=MAX_HISTORY_MESSAGES)
         self.current_session_id = None
         self.user_name = "User"
         
@@ -60,7 +69,7 @@ class MentalHealthAgent:
                 }
             ]
             
-            self.rag_system.add_knowledge_documents(sample_documents)
+            self.rag_system.seed_knowledge_documents(sample_documents)
             print("✓ Knowledge base initialized")
             
         except Exception as e:
@@ -68,7 +77,7 @@ class MentalHealthAgent:
     
     def start_new_chat(self):
         self.current_session_id = f"session_{int(time.time())}"
-        self.conversation_history = []
+        self.conversation_history.clear()
         
         print("\n" + "="*60)
         print("NEW CHAT SESSION STARTED")
@@ -89,39 +98,60 @@ class MentalHealthAgent:
             "session_id": self.current_session_id
         })
     
-    def _get_conversation_context(self, max_messages: int = 10) -> str:
-        if not self.conversation_history:
-            return ""
+    def _get_recent_history(self, max_messages: int = 10) -> List[Dict]:
+        # Walk back from the newest entry so only max_messages items are touched
+        recent_messages = itertools.islice(reversed(self.conversation_history), max_messages)
         
-        recent_messages = [msg for msg in self.conversation_history[-max_messages:] 
-                          if msg['role'] in ['user', 'assistant']]
+        history = [msg for msg in recent_messages if msg['role'] in ('user', 'assistant')][::-1]
         
-        context = "Recent conversation context:\n"
-        for msg in recent_messages:
-            speaker = "USER" if msg['role'] == 'user' else "ASSISTANT"
-            context += f"{speaker}: {msg['message']}\n"
+        # Keep the running summary of older turns in front of the verbatim ones
+        if self.conversation_history and self.conversation_history[0].get('summary'):
+            history.insert(0, self.conversation_history[0])
         
-        return context
+        return history
     
-    def process_message(self, user_input: str) -> str:
-        if not user_input.strip():
-            return "Please type something to chat with me."
-        
-        self._add_to_history("user", user_input)
-        
-        conversation_context = self._get_conversation_context()
+    def _compact_history(self):
+        if len(self.conversation_history) <= MAX_VERBATIM * 2:
+            return
         
-        contextual_query = f"{conversation_context}\nCurrent query: {user_input}" if conversation_context else user_input
+        # Any previous summary is the oldest entry, so it gets folded into the new one
+        oldest = list(itertools.islice(self.conversation_history, MAX_VERBATIM))
+        summary = self.rag_system.summarize_conversation(oldest)
+        if summary is None:
+            # Keep the turns verbatim and retry on the next turn
+            return
         
-        start_time = time.time()
-        response_data = self.rag_system.generate_response(contextual_query)
-        response_time = time.time() - start_time
+        for _ in range(MAX_VERBATIM):
+            self.conversation_history.popleft()
         
-        response = response_data['response']
+        self.conversation_history.appendleft({
+            "role": "system",
+            "message": f"Summary of the earlier conversation: {summary}",
+            "timestamp": oldest[-1]["timestamp"],
+            "session_id": self.current_session_id,
+            "summary": True
+        })
+    
+    def stream_message(self, user_input: str) -> Iterator[str]:
+        if not user_input.strip():
+            yield "Please type something to chat with me."
+            return
         
-        self._add_to_history("assistant", response)
+        history = self._get_recent_history()
+        self._add_to_history("user", user_input)
         
-        return response
+        chunks = []
+        try:
+            for chunk in self.rag_system.stream_response(user_input, history=history):
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            # An interrupted stream keeps whatever was shown; with nothing shown
+            # the user turn is dropped so history never ends on an unanswered message
+            if chunks:
+                self._add_to_history("assistant", "".join(chunks))
+            else:
+                self.conversation_history.pop()
     
     def show_help(self):
         help_text = """
@@ -148,11 +178,16 @@ AVAILABLE COMMANDS:
         
         for i, msg in enumerate(self.conversation_history, 1):
             timestamp = datetime.fromisoformat(msg['timestamp']).strftime("%H:%M:%S")
-            prefix = "👤 YOU: " if msg['role'] == 'user' else "🤖 AI: "
+            if msg.get('summary'):
+                prefix = "📝 SUMMARY: "
+            elif msg['role'] == 'system':
+                prefix = "ℹ️ SYSTEM: "
+            else:
+                prefix = "👤 YOU: " if msg['role'] == 'user' else "🤖 AI: "
             print(f"{i:2d}. [{timestamp}] {prefix}{msg['message']}")
     
     def clear_history(self):
-        self.conversation_history = []
+        self.conversation_history.clear()
         print("✓ Conversation history cleared")
     
     def save_conversation(self, filename: str = None):
@@ -168,11 +203,11 @@ AVAILABLE COMMANDS:
             data = {
                 "session_id": self.current_session_id,
                 "created_at": datetime.now().isoformat(),
-                "messages": self.conversation_history
+                "messages": list(self.conversation_history)
             }
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
             
             print(f"✓ Conversation saved to {filename}")
             
@@ -211,6 +246,22 @@ Technology Stack:
         print(f"Session ID: {self.current_session_id}")
         print(f"Messages in memory: {len(self.conversation_history)}")
     
+    def exit_chat(self):
+        print("👋 Goodbye! Take care of yourself.")
+        return False
+    
+    # Slash-command dispatch table; a handler returning False ends the chat loop
+    COMMANDS = {
+        "exit": exit_chat, "quit": exit_chat,
+        "new": start_new_chat, "reset": start_new_chat,
+        "help": show_help, "?": show_help,
+        "history": show_history, "hist": show_history,
+        "clear": clear_history, "cls": clear_history,
+        "save": save_conversation, "export": save_conversation,
+        "about": show_about, "info": show_about,
+        "stats": show_stats, "status": show_stats,
+    }
+    
     def run(self):
         print("🚀 Initializing Mental Health Chatbot Agent...")
         
@@ -223,51 +274,25 @@ Technology Stack:
                 if user_input.startswith('/'):
                     command = user_input[1:].lower()
                     
-                    if command in ['exit', 'quit']:
-                        print("👋 Goodbye! Take care of yourself.")
-                        break
-                    
-                    elif command in ['new', 'reset']:
-                        self.start_new_chat()
-                        continue
-                    
-                    elif command in ['help', '?']:
-                        self.show_help()
-                        continue
-                    
-                    elif command in ['history', 'hist']:
-                        self.show_history()
-                        continue
+                    handler = self.COMMANDS.get(command)
                     
-                    elif command in ['clear', 'cls']:
-                        self.clear_history()
-                        continue
-                    
-                    elif command in ['save', 'export']:
-                        self.save_conversation()
-                        continue
-                    
-                    elif command in ['about', 'info']:
-                        self.show_about()
-                        continue
-                    
-                    elif command in ['stats', 'status']:
-                        self.show_stats()
-                        continue
-                    
-                    else:
+                    if handler is None:
                         print("Unknown command. Type /help for available commands.")
-                        continue
+                    elif handler(self) is False:
+                        break
+                    continue
                 
                 print("\n🤖 AI: ", end="", flush=True)
                 
-                response = self.process_message(user_input)
-
-                for char in response:
-                    print(char, end="", flush=True)
-                    time.sleep(0.001)
+                # One write and one flush per streamed chunk, not per character
+                for chunk in self.stream_message(user_input):
+                    sys.stdout.write(chunk)
+                    sys.stdout.flush()
                 print()
                 
+                # Summarizing may call Groq, so it runs only after a reply completes
+                self._compact_history()
+                
             except KeyboardInterrupt:
                 print("\n\n Interrupted. Type /exit to quit or continue chatting.")
                 continue
@@ -2,18 +2,188 @@ import chromadb
 from chromadb.config import Settings
 from chromadb.utils import embedding_functions
 import requests
+from requests.adapters import HTTPAdapter
+import httpx
+import asyncio
 import json
 import os
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Iterator
 import re
 import numpy as np
 from sentence_transformers import SentenceTransformer
+import torch
 import time
+import hashlib
+from ulid import ULID
+import threading
+import redis
 
 
 os.environ["ANONYMIZED_TELEMETRY"] = "False"
 os.environ["CHROMA_TELEMETRY"] = "False"
 
+DEFAULT_SYSTEM_PROMPT = "You are a helpful AI assistant that provides accurate and compassionate responses."
+
+# Kept byte-identical across requests and sent ahead of the knowledge sources so
+# the prefill for this prefix can be reused by the provider's prompt cache.
+RAG_SYSTEM_PROMPT = """You are a compassionate mental health assistant from Group-33 (B.Tech CSE Cloud Computing & Automation). Provide supportive, evidence-based help.
+
+GUIDELINES:
+1. Be empathetic, validating, and non-judgmental
+2. Keep responses short, clear, and concise (2-3 paragraphs max)
+3. Use the provided knowledge sources to inform your response
+4. Only recommend professional help for serious medical concerns that require doctor intervention
+5. For crisis situations, provide appropriate hotline information
+6. Focus on practical coping strategies and recovery support
+7. Keep responses conversational and human-like"""
+
+
+class SemanticCache:
+    """
+    Semantic response cache for the RAG layer. Stores normalized query embeddings
+    next to their generated response data and serves a cached response when a new
+    query is close enough (cosine similarity) to one answered before. Queries are
+    embedded by the caller so the same vector can also be used for retrieval.
+    Optionally persisted to Redis so the cache survives restarts; every entry is
+    its own key, so several processes can share the cache without overwriting
+    each other.
+    """
+
+    def __init__(self, threshold: float = 0.93, max_entries: int = 1000,
+                 redis_url: Optional[str] = None, key_prefix: str = "q",
+                 ttl: int = 7 * 24 * 3600):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.key_prefix = key_prefix
+        self.ttl = ttl  # Seconds before persisted entries expire in Redis
+        self.embeddings = None  # float32 matrix of shape [N, D]
+        self.ids = []
+        self.responses = []
+        self.redis = None
+        self._lock = threading.Lock()
+
+        if redis_url:
+            self._initialize_redis(redis_url)
+
+    def _initialize_redis(self, redis_url: str):
+        """Connect to Redis and load any previously persisted cache entries"""
+        try:
+            self.redis = redis.Redis.from_url(redis_url)
+            self.redis.ping()
+            self._load_from_redis()
+            print(f"Semantic cache loaded {len(self.responses)} entries from Redis")
+        except Exception as e:
+            print(f"Error connecting semantic cache to Redis: {e}")
+            # Fallback to an in-memory only cache
+            self.redis = None
+
+    def _load_from_redis(self):
+        # ULID ids sort by creation time, so the newest entries are kept
+        keys = sorted(self.redis.scan_iter(match=f"{self.key_prefix}:*"))[-self.max_entries:]
+        if not keys:
+            return
+
+        embeddings = []
+        for key, payload in zip(keys, self.redis.mget(keys)):
+            # Entries may expire between the scan and the read
+            if payload is None:
+                continue
+            entry = json.loads(payload)
+            embeddings.append(entry["embedding"])
+            self.ids.append(key.decode("utf-8").split(":", 1)[1])
+            self.responses.append(entry["response"])
+
+        if embeddings:
+            self.embeddings = np.asarray(embeddings, dtype=np.float32)
+
+    def lookup(self, query_embedding: Optional[np.ndarray]) -> Optional[Dict]:
+        """
+        Return the cached response data for the nearest previous query if it is
+        above the similarity threshold.
+        """
+        if query_embedding is None:
+            return None
+
+        with self._lock:
+            if self.embeddings is None:
+                return None
+
+            # Embeddings are normalized, so the dot product is the cosine similarity
+            similarities = self.embeddings @ query_embedding
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                return dict(self.responses[best])
+
+        return None
+
+    def store(self, query_embedding: Optional[np.ndarray], response_data: Dict):
+        """Add a generated response to the cache"""
+        if query_embedding is None:
+            return
+
+        entry_id = str(ULID())
+
+        with self._lock:
+            if self.embeddings is None:
+                self.embeddings = query_embedding[np.newaxis, :]
+            else:
+                self.embeddings = np.vstack([self.embeddings, query_embedding])
+            self.ids.append(entry_id)
+            self.responses.append(response_data)
+
+            evicted = []
+            if len(self.responses) > self.max_entries:
+                overflow = len(self.responses) - self.max_entries
+                evicted = self.ids[:overflow]
+                self.embeddings = self.embeddings[overflow:]
+                self.ids = self.ids[overflow:]
+                self.responses = self.responses[overflow:]
+
+        if self.redis is None:
+            return
+
+        try:
+            entry = {"embedding": query_embedding.tolist(), "response": response_data}
+            self.redis.set(f"{self.key_prefix}:{entry_id}", json.dumps(entry), ex=self.ttl)
+            if evicted:
+                self.redis.delete(*[f"{self.key_prefix}:{old_id}" for old_id in evicted])
+        except Exception as e:
+            print(f"Error persisting semantic cache entry: {e}")
+
+    def clear(self):
+        """Remove all cached entries"""
+        with self._lock:
+            if self.redis is not None:
+                try:
+                    keys = list(self.redis.scan_iter(match=f"{self.key_prefix}:*"))
+                    if keys:
+                        self.redis.delete(*keys)
+                except Exception as e:
+                    print(f"Error clearing semantic cache: {e}")
+            self.embeddings = None
+            self.ids = []
+            self.responses = []
+
+
+class SharedModelEmbeddingFunction:
+    """
+    Chroma embedding function backed by an already loaded SentenceTransformer,
+    so the collection does not load a second copy of the model.
+    """
+
+    def __init__(self, model: SentenceTransformer, lock: threading.Lock):
+        self.model = model
+        self.lock = lock
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        with self.lock:
+            return self.model.encode(
+                list(input),
+                show_progress_bar=False,
+                normalize_embeddings=True,
+                convert_to_numpy=True
+            ).tolist()
+
 
 class MentalHealthRAG:
     """
@@ -22,17 +192,34 @@ class MentalHealthRAG:
     queries for non-mental health topics.
     """
     
-    def __init__(self, groq_api_key: str, chroma_db_path: str = "./chroma_mentalhealth_db"):
+    def __init__(self, groq_api_key: str, chroma_db_path: str = "./chroma_mentalhealth_db",
+                 quantize_embeddings: bool = True):
         self.groq_api_key = groq_api_key
         self.chroma_db_path = chroma_db_path
+        self.quantize_embeddings = quantize_embeddings
         self.embedding_model = None
         self.chroma_client = None
         self.collection = None
         
+        # SentenceTransformer tokenizers are not safe to call from several threads at once
+        self._embedding_lock = threading.Lock()
+        
+        # Long-lived HTTP clients so Groq connections (and their TLS handshakes)
+        # are reused across calls instead of being set up per request
+        self.http_session = requests.Session()
+        self.http_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=32))
+        
+        # Async client for the server's event loop, created on first async call
+        # so sync-only users (CLI, seeding) never open or leak one
+        self.async_http_client: Optional[httpx.AsyncClient] = None
+        
         # Initialize components
         self._initialize_embedding_model()
         self._initialize_chroma_db()
         
+        # Semantic response cache, keyed by embeddings from the same model
+        self.response_cache = SemanticCache(redis_url=os.getenv("REDIS_URL"))
+        
         # Mental health keywords for query classification
         self.mental_health_keywords = [
             'mental', 'health', 'therapy', 'therapist', 'counseling', 'counselor',
@@ -88,6 +275,21 @@ class MentalHealthRAG:
             print(f"Error loading embedding model: {e}")
             # Fallback to Chroma's default embedding
             self.embedding_model = None
+            return
+        
+        # sentence-transformers 2.2.2 keeps the weights on CPU until encode() moves
+        # them to _target_device, so .device would report "cpu" even on GPU hosts
+        if self.quantize_embeddings and self.embedding_model._target_device.type == "cpu":
+            try:
+                # Dynamic int8 quantization of the encoder's Linear layers;
+                # the embeddings it produces are still float32
+                transformer = self.embedding_model[0]
+                transformer.auto_model = torch.quantization.quantize_dynamic(
+                    transformer.auto_model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+            except Exception as e:
+                # The FP32 model is still usable, so keep it
+                print(f"Error quantizing embedding model, using FP32: {e}")
     
     def _initialize_chroma_db(self):
         """Initialize ChromaDB client and collection"""
@@ -100,9 +302,9 @@ class MentalHealthRAG:
             
             # Create or get collection
             if self.embedding_model:
-                # Use our own embedding function
-                embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-                    model_name="all-MiniLM-L6-v2"
+                # Reuse the loaded (possibly quantized) model
+                embedding_function = SharedModelEmbeddingFunction(
+                    self.embedding_model, self._embedding_lock
                 )
             else:
                 # Use default embedding function
@@ -149,18 +351,35 @@ class MentalHealthRAG:
             
         return False
     
+    @staticmethod
+    def _document_id(text: str) -> str:
+        """Deterministic document ID derived from the document text"""
+        return f"doc_{hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]}"
+    
     def add_knowledge_documents(self, documents: List[Dict[str, str]]):
         """
         Add mental health knowledge documents to the vector database.
         Each document should be a dict with 'text', 'source', and 'metadata' fields.
+        Documents already in the collection (same text) are skipped, and the new
+        ones are embedded in a single batched encode call.
         """
         try:
+            # Deduplicate by content hash, within the batch and against the collection
+            unique_documents = {}
+            for doc in documents:
+                unique_documents.setdefault(self._document_id(doc['text']), doc)
+            
+            existing_ids = set(self.collection.get(ids=list(unique_documents), include=[])['ids'])
+            
             # Extract texts, metadatas, and ids
             texts = []
             metadatas = []
             ids = []
             
-            for i, doc in enumerate(documents):
+            for doc_id, doc in unique_documents.items():
+                if doc_id in existing_ids:
+                    continue
+                
                 texts.append(doc['text'])
                 
                 # Convert list values to strings for ChromaDB compatibility
@@ -179,32 +398,102 @@ class MentalHealthRAG:
                 })
                 
                 metadatas.append(metadata)
-                ids.append(f"doc_{i}_{int(time.time())}")
+                ids.append(doc_id)
+            
+            if not texts:
+                print("All documents already present in knowledge base")
+                return True
+            
+            # Embed everything in one batched forward pass instead of one per document
+            embeddings = None
+            if self.embedding_model:
+                with self._embedding_lock:
+                    embeddings = self.embedding_model.encode(
+                        texts,
+                        batch_size=64,
+                        show_progress_bar=False,
+                        normalize_embeddings=True,
+                        convert_to_numpy=True
+                    ).tolist()
             
             # Add to collection
             self.collection.add(
                 documents=texts,
                 metadatas=metadatas,
+                embeddings=embeddings,
                 ids=ids
             )
             
-            print(f"Added {len(documents)} documents to knowledge base")
+            print(f"Added {len(texts)} documents to knowledge base")
             return True
             
         except Exception as e:
             print(f"Error adding documents to knowledge base: {e}")
             return False
     
-    def retrieve_relevant_context(self, query: str, n_results: int = 5) -> List[Dict]:
+    def seed_knowledge_documents(self, documents: List[Dict[str, str]]) -> bool:
+        """
+        Add a fixed seed set of documents unless this exact set was already seeded
+        into this database. Seed checksums are kept in a sidecar file next to the
+        ChromaDB data, so warm restarts skip embedding entirely.
+        """
+        seed_hash = hashlib.sha256(json.dumps(documents, sort_keys=True).encode('utf-8')).hexdigest()
+        seed_file = os.path.join(self.chroma_db_path, ".kb_seed")
+        
+        try:
+            with open(seed_file, 'r', encoding='utf-8') as f:
+                seed_hashes = set(f.read().split())
+        except FileNotFoundError:
+            seed_hashes = set()
+        
+        if seed_hash in seed_hashes and self.collection.count() > 0:
+            print("Knowledge base already seeded, skipping")
+            return True
+        
+        success = self.add_knowledge_documents(documents)
+        if success:
+            try:
+                with open(seed_file, 'a', encoding='utf-8') as f:
+                    f.write(seed_hash + "\n")
+            except Exception as e:
+                print(f"Error recording knowledge base seed: {e}")
+        
+        return success
+    
+    def embed_query(self, query: str) -> Optional[np.ndarray]:
+        """
+        Embed a query into a normalized float32 vector, or None without a model.
+        """
+        if self.embedding_model is None:
+            return None
+        
+        with self._embedding_lock:
+            return self.embedding_model.encode(
+                query, normalize_embeddings=True, convert_to_numpy=True
+            ).astype(np.float32)
+    
+    def retrieve_relevant_context(self, query: str, n_results: int = 5,
+                                  query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
         """
         Retrieve relevant context from the knowledge base for a given query.
+        An already computed query embedding can be passed to avoid embedding twice.
         """
         try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=n_results,
-                include=['documents', 'metadatas', 'distances']
-            )
+            if query_embedding is None:
+                query_embedding = self.embed_query(query)
+            
+            if query_embedding is not None:
+                results = self.collection.query(
+                    query_embeddings=[query_embedding.tolist()],
+                    n_results=n_results,
+                    include=['documents', 'metadatas', 'distances']
+                )
+            else:
+                results = self.collection.query(
+                    query_texts=[query],
+                    n_results=n_results,
+                    include=['documents', 'metadatas', 'distances']
+                )
             
             # Format results
             contexts = []
@@ -225,28 +514,19 @@ class MentalHealthRAG:
     def _format_rag_prompt(self, query: str, contexts: List[Dict]) -> str:
         """
         Format the prompt for RAG-based response generation.
+        The static instructions live in RAG_SYSTEM_PROMPT so repeated requests share
+        a cacheable prefix; sources keep their retrieval rank and the query comes last.
         """
         # Build context string
-        context_str = ""
-        for i, ctx in enumerate(contexts):
-            context_str += f"Source [{i+1}]: {ctx['text']}\n\n"
+        context_str = "".join(
+            f"Source [{i+1}]: {ctx['text']}\n\n" for i, ctx in enumerate(contexts)
+        )
     
-    # Create the prompt
-        prompt = f"""You are a compassionate mental health assistant from Group-33 (B.Tech CSE Cloud Computing & Automation). Provide supportive, evidence-based help.
-        KNOWLEDGE SOURCES: {context_str}
-
-        USER QUERY: {query}
-
-        GUIDELINES:
-        1. Be empathetic, validating, and non-judgmental
-        2. Keep responses short, clear, and concise (2-3 paragraphs max)
-        3. Use the provided knowledge sources to inform your response
-        4. Only recommend professional help for serious medical concerns that require doctor intervention
-        5. For crisis situations, provide appropriate hotline information
-        6. Focus on practical coping strategies and recovery support
-        7. Keep responses conversational and human-like
+        # Create the prompt
+        prompt = f"""KNOWLEDGE SOURCES: {context_str}
+USER QUERY: {query}
 
-        RESPONSE:"""
+RESPONSE:"""
 
         return prompt
 
@@ -266,60 +546,150 @@ class MentalHealthRAG:
         
         return prompt
     
-    def call_groq_api(self, prompt: str, max_tokens: int = 1024) -> str:
+    def _build_groq_request(self, prompt: str, max_tokens: int, system_prompt: str,
+                            stream: bool, history: Optional[List[Dict]] = None) -> Tuple[str, Dict, Dict]:
+        """
+        Build the URL, headers and payload for a Groq chat completion request.
+        Prior conversation turns ({'role', 'message'} dicts) are sent as chat
+        messages between the system prompt and the current prompt.
+        """
+        url = "https://api.groq.com/openai/v1/chat/completions"
+        
+        headers = {
+            "Authorization": f"Bearer {self.groq_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        data = {
+            "model": "llama-3.3-70b-versatile",
+            "messages": [
+                {
+                    "role": "system",
+                    "content": system_prompt
+                },
+                *(
+                    {"role": msg['role'], "content": msg['message']}
+                    for msg in history or []
+                    if msg['role'] in ('system', 'user', 'assistant')
+                ),
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": 0.7,
+            "max_tokens": max_tokens,
+            "top_p": 1,
+            "stream": stream
+        }
+        
+        return url, headers, data
+    
+    def _request_groq_completion(self, prompt: str, max_tokens: int = 1024,
+                                 system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+                                 history: Optional[List[Dict]] = None) -> str:
+        """
+        Call the Groq API with the given prompt, raising on any failure.
+        """
+        url, headers, data = self._build_groq_request(prompt, max_tokens, system_prompt, stream=False,
+                                                      history=history)
+        
+        response = self.http_session.post(url, headers=headers, json=data, timeout=30)
+        response.raise_for_status()
+        
+        result = response.json()
+        return result['choices'][0]['message']['content']
+    
+    @staticmethod
+    def _groq_error_message(error: Exception) -> str:
+        """
+        User-facing apology for a failed Groq call.
+        """
+        if isinstance(error, (requests.exceptions.Timeout, httpx.TimeoutException)):
+            return "I'm sorry, the request timed out. Please try again."
+        if isinstance(error, (requests.exceptions.RequestException, httpx.HTTPError)):
+            return f"I'm sorry, there was an error processing your request: {str(error)}"
+        return f"I'm sorry, an unexpected error occurred: {str(error)}"
+    
+    def call_groq_api(self, prompt: str, max_tokens: int = 1024,
+                      system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+                      history: Optional[List[Dict]] = None) -> str:
         """
         Call the Groq API with the given prompt.
+        Failures are returned as an apology message instead of being raised.
         """
         try:
-            url = "https://api.groq.com/openai/v1/chat/completions"
-            
-            headers = {
-                "Authorization": f"Bearer {self.groq_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": "llama-3.3-70b-versatile",
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "You are a helpful AI assistant that provides accurate and compassionate responses."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "temperature": 0.7,
-                "max_tokens": max_tokens,
-                "top_p": 1,
-                "stream": False
-            }
-            
-            response = requests.post(url, headers=headers, json=data, timeout=30)
-            response.raise_for_status()
-            
-            result = response.json()
-            return result['choices'][0]['message']['content']
-            
-        except requests.exceptions.Timeout:
-            return "I'm sorry, the request timed out. Please try again."
-        except requests.exceptions.RequestException as e:
-            return f"I'm sorry, there was an error processing your request: {str(e)}"
+            return self._request_groq_completion(prompt, max_tokens, system_prompt, history)
         except Exception as e:
-            return f"I'm sorry, an unexpected error occurred: {str(e)}"
+            return self._groq_error_message(e)
     
-    def generate_response(self, query: str, use_rag: bool = True) -> Dict[str, str]:
+    async def _arequest_groq_completion(self, prompt: str, max_tokens: int = 1024,
+                                        system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+                                        history: Optional[List[Dict]] = None) -> str:
         """
-        Generate a response to the user query, using RAG for mental health queries
-        and direct API calls for general knowledge queries.
+        Async version of _request_groq_completion, raising on any failure.
         """
-        start_time = time.time()
+        url, headers, data = self._build_groq_request(prompt, max_tokens, system_prompt, stream=False,
+                                                      history=history)
+        
+        if self.async_http_client is None:
+            # HTTP/2 multiplexes concurrent chats over a single connection
+            self.async_http_client = httpx.AsyncClient(
+                http2=True,
+                timeout=30,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+            )
+        
+        response = await self.async_http_client.post(url, headers=headers, json=data)
+        response.raise_for_status()
+        
+        result = response.json()
+        return result['choices'][0]['message']['content']
+    
+    async def acall_groq_api(self, prompt: str, max_tokens: int = 1024,
+                             system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+                             history: Optional[List[Dict]] = None) -> str:
+        """
+        Async version of call_groq_api that does not block the event loop.
+        """
+        try:
+            return await self._arequest_groq_completion(prompt, max_tokens, system_prompt, history)
+        except Exception as e:
+            return self._groq_error_message(e)
+    
+    def stream_groq_api(self, prompt: str, max_tokens: int = 1024,
+                        system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+                        history: Optional[List[Dict]] = None) -> Iterator[str]:
+        """
+        Call the Groq API with streaming enabled and yield content chunks as they
+        arrive. Unlike call_groq_api, errors are raised to the caller.
+        """
+        url, headers, data = self._build_groq_request(prompt, max_tokens, system_prompt, stream=True,
+                                                      history=history)
         
+        with self.http_session.post(url, headers=headers, json=data, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            
+            # Server-sent events: one "data: {...}" line per chunk, ended by "data: [DONE]"
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data: "):
+                    continue
+                payload = line[len("data: "):]
+                if payload == "[DONE]":
+                    break
+                
+                content = json.loads(payload)['choices'][0]['delta'].get('content')
+                if content:
+                    yield content
+    
+    def _new_response_data(self, query: str, use_rag: bool) -> Dict:
+        """
+        Create the response data dict for a query before any generation happens.
+        """
         # Determine if this is a mental health query
         is_mental_health = self._is_mental_health_query(query)
         
-        response_data = {
+        return {
             "query": query,
             "is_mental_health": is_mental_health,
             "response": "",
@@ -327,37 +697,191 @@ class MentalHealthRAG:
             "response_time": 0,
             "method": "rag" if (is_mental_health and use_rag) else "direct"
         }
+    
+    def _prepare_prompt(self, query: str, use_rag: bool, response_data: Dict,
+                        query_embedding: Optional[np.ndarray] = None) -> Tuple[str, str]:
+        """
+        Retrieve context for mental health queries and build the prompt.
+        Returns the prompt and the system prompt to send with it.
+        """
+        if response_data["is_mental_health"] and use_rag:
+            # Mental health query with RAG
+            contexts = self.retrieve_relevant_context(query, query_embedding=query_embedding)
+            response_data["contexts"] = contexts
+            
+            if contexts:
+                return self._format_rag_prompt(query, contexts), RAG_SYSTEM_PROMPT
+            
+            # Fallback if no contexts found
+            response_data["method"] = "direct_fallback"
+        
+        # General knowledge query, RAG disabled or no contexts
+        return self._format_general_prompt(query), DEFAULT_SYSTEM_PROMPT
+    
+    def summarize_conversation(self, messages: List[Dict], max_tokens: int = 256) -> Optional[str]:
+        """
+        Condense earlier conversation turns into a short running summary so the
+        history sent to the LLM stays bounded. Returns None if the call fails.
+        """
+        transcript = "\n".join(f"{msg['role'].upper()}: {msg['message']}" for msg in messages)
+        
+        prompt = f"""Summarize the following conversation between a user and a mental health assistant in at most 200 tokens. Keep the user's main concerns, feelings, and any advice already given.
+
+CONVERSATION:
+{transcript}
+
+SUMMARY:"""
         
         try:
-            if is_mental_health and use_rag:
-                # Mental health query with RAG
-                contexts = self.retrieve_relevant_context(query)
-                response_data["contexts"] = contexts
-                
-                if contexts:
-                    prompt = self._format_rag_prompt(query, contexts)
-                    response = self.call_groq_api(prompt)
-                else:
-                    # Fallback if no contexts found
-                    prompt = self._format_general_prompt(query)
-                    response = self.call_groq_api(prompt)
-                    response_data["method"] = "direct_fallback"
-                
-            else:
-                # General knowledge query or RAG disabled
-                prompt = self._format_general_prompt(query)
-                response = self.call_groq_api(prompt)
+            return self._request_groq_completion(prompt, max_tokens=max_tokens)
+        except Exception as e:
+            print(f"Error summarizing conversation: {e}")
+            return None
+    
+    def generate_response(self, query: str, use_rag: bool = True,
+                          history: Optional[List[Dict]] = None,
+                          query_embedding: Optional[np.ndarray] = None) -> Dict[str, str]:
+        """
+        Generate a response to the user query, using RAG for mental health queries
+        and direct API calls for general knowledge queries.
+        Retrieval only uses the query itself; earlier turns in history are passed
+        to the LLM as chat messages.
+        """
+        start_time = time.time()
+        
+        response_data = self._new_response_data(query, use_rag)
+        
+        try:
+            prompt, system_prompt = self._prepare_prompt(query, use_rag, response_data, query_embedding)
+            response_data["response"] = self._request_groq_completion(prompt, system_prompt=system_prompt,
+                                                                      history=history)
             
-            response_data["response"] = response
+        except Exception as e:
+            # Marked as an error so the semantic cache never stores the apology
+            response_data["response"] = self._groq_error_message(e)
+            response_data["method"] = "error"
+        
+        response_data["response_time"] = time.time() - start_time
+        
+        return response_data
+    
+    def _probe_cache(self, query: str, history: Optional[List[Dict]]) -> Tuple[Optional[Dict], Optional[np.ndarray]]:
+        """
+        Embed the query once and look it up in the semantic cache. Returns the
+        cached response data (if any) and the embedding for reuse in retrieval.
+        """
+        # Answers that depend on earlier turns are not reused across conversations
+        if history:
+            return None, None
+        
+        query_embedding = self.embed_query(query)
+        return self.response_cache.lookup(query_embedding), query_embedding
+    
+    def stream_response(self, query: str, use_rag: bool = True,
+                        history: Optional[List[Dict]] = None) -> Iterator[str]:
+        """
+        Stream the response to the user query as the LLM generates it, going through
+        the semantic cache like generate_cached_response. Yields text chunks.
+        """
+        start_time = time.time()
+        
+        # Answers that depend on earlier turns are not reused across conversations
+        cached, query_embedding = self._probe_cache(query, history)
+        if cached is not None:
+            yield cached["response"]
+            return
+        
+        response_data = self._new_response_data(query, use_rag)
+        chunks = []
+        
+        try:
+            prompt, system_prompt = self._prepare_prompt(query, use_rag, response_data, query_embedding)
+            for chunk in self.stream_groq_api(prompt, system_prompt=system_prompt, history=history):
+                chunks.append(chunk)
+                yield chunk
             
         except Exception as e:
-            response_data["response"] = f"I'm sorry, I encountered an error while processing your request: {str(e)}"
+            chunks.append(self._groq_error_message(e))
             response_data["method"] = "error"
+            yield chunks[-1]
         
+        response_data["response"] = "".join(chunks)
         response_data["response_time"] = time.time() - start_time
         
+        # Never cache failures
+        if response_data["method"] != "error":
+            self.response_cache.store(query_embedding, response_data)
+    
+    def generate_cached_response(self, query: str, use_rag: bool = True,
+                                 history: Optional[List[Dict]] = None) -> Dict[str, str]:
+        """
+        Generate a response through the semantic cache. Paraphrases of a previously
+        answered query are served from the cache instead of calling the LLM again.
+        """
+        start_time = time.time()
+        
+        cached, query_embedding = self._probe_cache(query, history)
+        if cached is not None:
+            cached["cached"] = True
+            cached["response_time"] = time.time() - start_time
+            return cached
+        
+        response_data = self.generate_response(query, use_rag=use_rag, history=history,
+                                               query_embedding=query_embedding)
+        
+        # Never cache failures
+        if response_data["method"] != "error":
+            self.response_cache.store(query_embedding, response_data)
+        
         return response_data
     
+    async def agenerate_response(self, query: str, use_rag: bool = True,
+                                 history: Optional[List[Dict]] = None) -> Dict[str, str]:
+        """
+        Async counterpart of generate_cached_response for use inside the server's
+        event loop. Embedding and ChromaDB retrieval run in worker threads (retrieval
+        only on a cache miss), and the Groq call is awaited on the shared async client.
+        """
+        start_time = time.time()
+        
+        response_data = self._new_response_data(query, use_rag)
+        query_embedding = None
+        
+        try:
+            cached, query_embedding = await asyncio.to_thread(self._probe_cache, query, history)
+            if cached is not None:
+                cached["cached"] = True
+                cached["response_time"] = time.time() - start_time
+                return cached
+            
+            prompt, system_prompt = await asyncio.to_thread(
+                self._prepare_prompt, query, use_rag, response_data, query_embedding
+            )
+            response_data["response"] = await self._arequest_groq_completion(prompt, system_prompt=system_prompt,
+                                                                             history=history)
+            
+        except Exception as e:
+            # Marked as an error so the semantic cache never stores the apology
+            response_data["response"] = self._groq_error_message(e)
+            response_data["method"] = "error"
+        
+        response_data["response_time"] = time.time() - start_time
+        
+        # Never cache failures
+        if response_data["method"] != "error":
+            await asyncio.to_thread(self.response_cache.store, query_embedding, response_data)
+        
+        return response_data
+    
+    async def aclose(self):
+        """
+        Close the shared HTTP clients.
+        """
+        if self.async_http_client is not None:
+            await self.async_http_client.aclose()
+            self.async_http_client = None
+        self.http_session.close()
+    
     def search_similar_documents(self, query: str, n_results: int = 3) -> List[Dict]:
         """
         Search for similar documents in the knowledge base.
@@ -450,7 +974,7 @@ def initialize_mental_health_knowledge_base(rag_system: MentalHealthRAG, sample_
     ]
     
     # Add sample documents to the knowledge base
-    success = rag_system.add_knowledge_documents(sample_documents)
+    success = rag_system.seed_knowledge_documents(sample_documents)
     if success:
         print("Sample mental health knowledge base initialized")
     else:
@@ -1,38 +1,129 @@
 # server.py
-from fastapi import FastAPI, HTTPException, Request, status
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi import FastAPI, HTTPException, Path, Request, Response, status
+from fastapi.responses import ORJSONResponse, HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Dict, Optional
 import logging
+import logging.handlers
+import queue
+import atexit
 import sys
 import time
 import json
-import uuid
+from ulid import ULID
 from datetime import datetime
 import uvicorn
 import os
+import asyncio
+from redis import asyncio as redis_asyncio
 
 from rag import MentalHealthRAG
 
 
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
+
+# Request handlers only enqueue records; a background listener thread does the
+# formatting and the file/console writes.
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+log_handlers = [
+    logging.FileHandler("mental_health_server.log"),
+    logging.StreamHandler(sys.stdout)
+]
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
+
+log_queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# The QueueHandler only merges the message; the listener's handlers add the prefix
 logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("mental_health_server.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
+    level=LOG_LEVEL,
+    format="%(message)s",
+    handlers=[logging.handlers.QueueHandler(log_queue)]
 )
 logger = logging.getLogger("mental_health_server")
 
+# Seeded into the knowledge base on startup
+SAMPLE_DOCUMENTS = [
+    {
+        "text": "Depression is treatable with therapy and medication. Symptoms include persistent sadness, loss of interest, and low energy.",
+        "source": "WHO",
+        "type": "condition",
+        "metadata": {"condition": "depression"}
+    },
+    {
+        "text": "Anxiety disorders involve excessive fear/worry. Treatment includes CBT, exposure therapy, and relaxation techniques.",
+        "source": "APA",
+        "type": "condition",
+        "metadata": {"condition": "anxiety"}
+    },
+    {
+        "text": "For mental health crisis, call/text 988 for free, confidential support 24/7.",
+        "source": "988 Lifeline",
+        "type": "resource",
+        "metadata": {"resource": "crisis"}
+    }
+]
+
+# Only the most recent messages of each session are kept in Redis
+MAX_SESSION_MESSAGES = 100
+
+# Sessions expire after this many seconds without a new message
+SESSION_TTL = 7 * 24 * 3600
+
+# Session IDs end up in Redis keys, so only plain ID characters are accepted
+SESSION_ID_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
+
+# Static landing page, encoded once at import instead of on every request
+ROOT_HTML = """
+<html>
+    <head>
+        <title>Mental Health Chatbot API</title>
+        <style>
+            body { font-family: Arial, sans-serif; max-width: 800px; margin: 0 auto; padding: 20px; }
+            .header { background: #f0f8ff; padding: 20px; border-radius: 10px; margin-bottom: 20px; }
+            .endpoints { background: #f9f9f9; padding: 15px; border-radius: 5px; }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>🤖 Mental Health Chatbot API</h1>
+            <p>RAG-powered mental health assistant with Groq API and ChromaDB</p>
+            <p>Developed by Group-33, B.Tech CSE Cloud Computing & Automation</p>
+        </div>
+        
+        <div class="endpoints">
+            <h2>Available Endpoints:</h2>
+            <ul>
+                <li><strong>GET /health</strong> - Health check</li>
+                <li><strong>POST /chat</strong> - Send a message to the chatbot</li>
+                <li><strong>GET /sessions</strong> - List active sessions</li>
+                <li><strong>DELETE /sessions/{session_id}</strong> - Delete a session</li>
+                <li><strong>GET /docs</strong> - API documentation</li>
+            </ul>
+        </div>
+        
+        <p>Visit <a href="/docs">/docs</a> for detailed API documentation.</p>
+    </body>
+</html>
+""".encode("utf-8")
+
 class ChatMessage(BaseModel):
-    message: str = Field(..., description="User message")
-    session_id: Optional[str] = Field(None, description="Session ID for conversation continuity")
+    model_config = ConfigDict(extra="forbid")
+
+    message: str = Field(..., strict=True, description="User message")
+    session_id: Optional[str] = Field(None, strict=True, pattern=SESSION_ID_PATTERN,
+                                      description="Session ID for conversation continuity")
 
 class ChatResponse(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     response: str = Field(..., description="AI response")
     session_id: str = Field(..., description="Session ID")
     is_mental_health: bool = Field(..., description="Whether query was mental health related")
@@ -40,11 +131,15 @@ class ChatResponse(BaseModel):
     timestamp: str = Field(..., description="Response timestamp")
 
 class SessionInfo(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     session_id: str = Field(..., description="Session ID")
     created_at: str = Field(..., description="Session creation timestamp")
     message_count: int = Field(..., description="Number of messages in session")
 
 class HealthCheck(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     status: str = Field(..., description="Server status")
     timestamp: str = Field(..., description="Current timestamp")
     version: str = Field(..., description="API version")
@@ -52,6 +147,8 @@ class HealthCheck(BaseModel):
     chroma_connected: bool = Field(..., description="ChromaDB connection status")
 
 class ErrorResponse(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     error: str = Field(..., description="Error message")
     details: Optional[str] = Field(None, description="Error details")
     timestamp: str = Field(..., description="Error timestamp")
@@ -62,6 +159,7 @@ class MentalHealthServer:
             title="Mental Health Chatbot API",
             description="RAG-powered mental health assistant with Groq API and ChromaDB",
             version="1.0.0",
+            default_response_class=ORJSONResponse,
             docs_url="/docs",
             redoc_url="/redoc"
         )
@@ -72,12 +170,59 @@ class MentalHealthServer:
             raise ValueError("GROQ_API_KEY environment variable is required")
         
         self.rag_system = None
-        self.sessions = {}
+        self.ready = asyncio.Event()
+        self.startup_error: Optional[str] = None
+        self._warmup_task = None
+        self.redis = redis_asyncio.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            decode_responses=True
+        )
         self.setup_middleware()
         self.setup_routes()
         
         logger.info("MentalHealthServer initialized")
 
+    async def _append_session_messages(self, session_id: str, *messages: Dict):
+        key = f"session_msgs:{session_id}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, *(json.dumps(msg) for msg in messages))
+            pipe.ltrim(key, -MAX_SESSION_MESSAGES, -1)
+            pipe.expire(key, SESSION_TTL)
+            pipe.expire(f"session:{session_id}", SESSION_TTL)
+            # Session index scored by last activity, plus per-session message counts
+            pipe.zadd("sessions", {session_id: time.time()})
+            pipe.hincrby("stats:session_msgs", session_id, len(messages))
+            pipe.incrby("stats:msgs", len(messages))
+            await pipe.execute()
+
+    async def _forget_session(self, session_id: str):
+        # ZREM succeeds for exactly one caller, so the message total is only reduced once
+        if not await self.redis.zrem("sessions", session_id):
+            return
+        
+        message_count = await self.redis.hget("stats:session_msgs", session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hdel("stats:session_msgs", session_id)
+            pipe.decrby("stats:msgs", int(message_count or 0))
+            await pipe.execute()
+
+    async def _prune_expired_sessions(self):
+        expired = await self.redis.zrangebyscore("sessions", "-inf", time.time() - SESSION_TTL)
+        for session_id in expired:
+            await self._forget_session(session_id)
+
+    async def _warmup(self):
+        try:
+            self.rag_system = await asyncio.to_thread(MentalHealthRAG, groq_api_key=self.groq_api_key)
+            
+            await asyncio.to_thread(self.rag_system.seed_knowledge_documents, SAMPLE_DOCUMENTS)
+            logger.info("Knowledge base initialized with sample data")
+            self.ready.set()
+            
+        except Exception as e:
+            self.startup_error = str(e)
+            logger.error("Failed to initialize RAG system: %s", e)
+
     def setup_middleware(self):
         self.app.add_middleware(
             CORSMiddleware,
@@ -87,17 +232,20 @@ class MentalHealthServer:
             allow_headers=["*"],
         )
         
+        # Level 4 gets most of the size reduction on JSON for a fraction of the CPU of level 9
+        self.app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=4)
+        
         @self.app.middleware("http")
         async def log_requests(request: Request, call_next):
             start_time = time.time()
-            request_id = str(uuid.uuid4())
+            request_id = str(ULID())
             
-            logger.info(f"Request {request_id} started: {request.method} {request.url}")
+            logger.info("Request %s started: %s %s", request_id, request.method, request.url)
             
             response = await call_next(request)
             
             process_time = time.time() - start_time
-            logger.info(f"Request {request_id} completed: {process_time:.3f}s - Status: {response.status_code}")
+            logger.info("Request %s completed: %.3fs - Status: %s", request_id, process_time, response.status_code)
             
             response.headers["X-Process-Time"] = str(process_time)
             response.headers["X-Request-ID"] = request_id
@@ -108,133 +256,101 @@ class MentalHealthServer:
         
         @self.app.on_event("startup")
         async def startup_event():
-            try:
-                logger.info("Starting server initialization...")
-                self.rag_system = MentalHealthRAG(groq_api_key=self.groq_api_key)
-                
-                sample_documents = [
-                    {
-                        "text": "Depression is treatable with therapy and medication. Symptoms include persistent sadness, loss of interest, and low energy.",
-                        "source": "WHO",
-                        "type": "condition",
-                        "metadata": {"condition": "depression"}
-                    },
-                    {
-                        "text": "Anxiety disorders involve excessive fear/worry. Treatment includes CBT, exposure therapy, and relaxation techniques.",
-                        "source": "APA",
-                        "type": "condition",
-                        "metadata": {"condition": "anxiety"}
-                    },
-                    {
-                        "text": "For mental health crisis, call/text 988 for free, confidential support 24/7.",
-                        "source": "988 Lifeline",
-                        "type": "resource",
-                        "metadata": {"resource": "crisis"}
-                    }
-                ]
-                
-                self.rag_system.add_knowledge_documents(sample_documents)
-                logger.info("Knowledge base initialized with sample data")
-                
-            except Exception as e:
-                logger.error(f"Failed to initialize RAG system: {str(e)}")
-                raise
+            # Load the RAG system in the background so /health answers right away
+            logger.info("Starting server initialization...")
+            self._warmup_task = asyncio.create_task(self._warmup())
+
+        @self.app.on_event("shutdown")
+        async def shutdown_event():
+            if self.rag_system:
+                await self.rag_system.aclose()
+            await self.redis.close()
 
         @self.app.get("/", response_class=HTMLResponse)
         async def root(request: Request):
             logger.info("Root endpoint accessed")
-            return """
-            <html>
-                <head>
-                    <title>Mental Health Chatbot API</title>
-                    <style>
-                        body { font-family: Arial, sans-serif; max-width: 800px; margin: 0 auto; padding: 20px; }
-                        .header { background: #f0f8ff; padding: 20px; border-radius: 10px; margin-bottom: 20px; }
-                        .endpoints { background: #f9f9f9; padding: 15px; border-radius: 5px; }
-                    </style>
-                </head>
-                <body>
-                    <div class="header">
-                        <h1>🤖 Mental Health Chatbot API</h1>
-                        <p>RAG-powered mental health assistant with Groq API and ChromaDB</p>
-                        <p>Developed by Group-33, B.Tech CSE Cloud Computing & Automation</p>
-                    </div>
-                    
-                    <div class="endpoints">
-                        <h2>Available Endpoints:</h2>
-                        <ul>
-                            <li><strong>GET /health</strong> - Health check</li>
-                            <li><strong>POST /chat</strong> - Send a message to the chatbot</li>
-                            <li><strong>GET /sessions</strong> - List active sessions</li>
-                            <li><strong>DELETE /sessions/{session_id}</strong> - Delete a session</li>
-                            <li><strong>GET /docs</strong> - API documentation</li>
-                        </ul>
-                    </div>
-                    
-                    <p>Visit <a href="/docs">/docs</a> for detailed API documentation.</p>
-                </body>
-            </html>
-            """
+            return HTMLResponse(content=ROOT_HTML)
 
         @self.app.get("/health", response_model=HealthCheck)
-        async def health_check():
+        async def health_check(response: Response):
             try:
+                if self.startup_error:
+                    response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+                
                 health_status = HealthCheck(
-                    status="healthy",
+                    status="unhealthy" if self.startup_error else "healthy",
                     timestamp=datetime.now().isoformat(),
                     version="1.0.0",
                     groq_connected=self.groq_api_key is not None,
-                    chroma_connected=self.rag_system is not None
+                    chroma_connected=self.ready.is_set()
                 )
                 logger.info("Health check passed")
                 return health_status
             except Exception as e:
-                logger.error(f"Health check failed: {str(e)}")
+                logger.error("Health check failed: %s", e)
                 raise HTTPException(status_code=500, detail="Health check failed")
 
-        @self.app.post("/chat", response_model=ChatResponse)
+        # No response_model: FastAPI would re-validate the reply; the schema is still documented
+        @self.app.post("/chat", responses={200: {"model": ChatResponse}})
         async def chat_endpoint(chat_message: ChatMessage):
+            if self.startup_error:
+                raise HTTPException(
+                    status_code=500,
+                    detail="RAG system failed to initialize"
+                )
+            
+            if not self.ready.is_set():
+                raise HTTPException(
+                    status_code=503,
+                    detail="RAG system is warming up, please retry shortly"
+                )
+            
             try:
                 start_time = time.time()
+                # One timestamp when the message arrives and one when the reply is ready
+                received_at = datetime.now().isoformat()
                 
-                session_id = chat_message.session_id or str(uuid.uuid4())
-                if session_id not in self.sessions:
-                    self.sessions[session_id] = {
-                        "created_at": datetime.now().isoformat(),
-                        "messages": []
-                    }
-                    logger.info(f"Created new session: {session_id}")
+                session_id = chat_message.session_id or str(ULID())
+                created = await self.redis.hsetnx(
+                    f"session:{session_id}", "created_at", received_at
+                )
+                if created:
+                    # Clear any stats left over from an expired session with the same ID
+                    await self._forget_session(session_id)
+                    logger.info("Created new session: %s", session_id)
                 
-                self.sessions[session_id]["messages"].append({
+                await self._append_session_messages(session_id, {
                     "role": "user",
                     "message": chat_message.message,
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": received_at
                 })
                 
-                logger.info(f"Processing message in session {session_id}: {chat_message.message[:50]}...")
+                logger.info("Processing message in session %s: %.50s...", session_id, chat_message.message)
 
-                response_data = self.rag_system.generate_response(chat_message.message)
+                response_data = await self.rag_system.agenerate_response(chat_message.message)
+                responded_at = datetime.now().isoformat()
                 
-                self.sessions[session_id]["messages"].append({
+                await self._append_session_messages(session_id, {
                     "role": "assistant",
                     "message": response_data["response"],
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": responded_at
                 })
                 
                 response_time = time.time() - start_time
                 
-                logger.info(f"Response generated in {response_time:.3f}s for session {session_id}")
+                logger.info("Response generated in %.3fs for session %s", response_time, session_id)
                 
-                return ChatResponse(
-                    response=response_data["response"],
-                    session_id=session_id,
-                    is_mental_health=response_data["is_mental_health"],
-                    response_time=response_time,
-                    timestamp=datetime.now().isoformat()
-                )
+                # Assembled from trusted internal data, so it is serialized without validation
+                return ORJSONResponse({
+                    "response": response_data["response"],
+                    "session_id": session_id,
+                    "is_mental_health": response_data["is_mental_health"],
+                    "response_time": response_time,
+                    "timestamp": responded_at
+                })
                 
             except Exception as e:
-                logger.error(f"Chat endpoint error: {str(e)}")
+                logger.error("Chat endpoint error: %s", e)
                 raise HTTPException(
                     status_code=500,
                     detail=f"Error processing message: {str(e)}"
@@ -243,70 +359,84 @@ class MentalHealthServer:
         @self.app.get("/sessions", response_model=List[SessionInfo])
         async def list_sessions():
             try:
+                await self._prune_expired_sessions()
+                session_ids = await self.redis.zrange("sessions", 0, -1)
+                
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for session_id in session_ids:
+                        pipe.hget(f"session:{session_id}", "created_at")
+                        pipe.llen(f"session_msgs:{session_id}")
+                    results = await pipe.execute()
+                
                 sessions_info = []
-                for session_id, session_data in self.sessions.items():
+                for i, session_id in enumerate(session_ids):
                     sessions_info.append(SessionInfo(
                         session_id=session_id,
-                        created_at=session_data["created_at"],
-                        message_count=len(session_data["messages"])
+                        created_at=results[2 * i] or "",
+                        message_count=results[2 * i + 1]
                     ))
                 
-                logger.info(f"Listed {len(sessions_info)} active sessions")
+                logger.info("Listed %d active sessions", len(sessions_info))
                 return sessions_info
                 
             except Exception as e:
-                logger.error(f"Error listing sessions: {str(e)}")
+                logger.error("Error listing sessions: %s", e)
                 raise HTTPException(
                     status_code=500,
                     detail=f"Error listing sessions: {str(e)}"
                 )
 
         @self.app.get("/sessions/{session_id}", response_model=Dict)
-        async def get_session(session_id: str):
+        async def get_session(session_id: str = Path(..., pattern=SESSION_ID_PATTERN)):
 
             try:
-                if session_id not in self.sessions:
-                    logger.warning(f"Session not found: {session_id}")
+                session_data = await self.redis.hgetall(f"session:{session_id}")
+                if not session_data:
+                    logger.warning("Session not found: %s", session_id)
                     raise HTTPException(
                         status_code=404,
                         detail=f"Session {session_id} not found"
                     )
                 
-                logger.info(f"Retrieved session: {session_id}")
+                messages = await self.redis.lrange(f"session_msgs:{session_id}", 0, -1)
+                
+                logger.info("Retrieved session: %s", session_id)
                 return {
                     "session_id": session_id,
-                    **self.sessions[session_id]
+                    **session_data,
+                    "messages": [json.loads(msg) for msg in messages]
                 }
                 
             except HTTPException:
                 raise
             except Exception as e:
-                logger.error(f"Error getting session: {str(e)}")
+                logger.error("Error getting session: %s", e)
                 raise HTTPException(
                     status_code=500,
                     detail=f"Error getting session: {str(e)}"
                 )
 
         @self.app.delete("/sessions/{session_id}")
-        async def delete_session(session_id: str):
+        async def delete_session(session_id: str = Path(..., pattern=SESSION_ID_PATTERN)):
 
             try:
-                if session_id not in self.sessions:
-                    logger.warning(f"Session not found for deletion: {session_id}")
+                deleted = await self.redis.delete(f"session:{session_id}", f"session_msgs:{session_id}")
+                if not deleted:
+                    logger.warning("Session not found for deletion: %s", session_id)
                     raise HTTPException(
                         status_code=404,
                         detail=f"Session {session_id} not found"
                     )
                 
-                del self.sessions[session_id]
-                logger.info(f"Deleted session: {session_id}")
+                await self._forget_session(session_id)
+                logger.info("Deleted session: %s", session_id)
                 
                 return {"message": f"Session {session_id} deleted successfully"}
                 
             except HTTPException:
                 raise
             except Exception as e:
-                logger.error(f"Error deleting session: {str(e)}")
+                logger.error("Error deleting session: %s", e)
                 raise HTTPException(
                     status_code=500,
                     detail=f"Error deleting session: {str(e)}"
@@ -315,11 +445,14 @@ class MentalHealthServer:
         @self.app.get("/stats")
         async def get_stats():
             try:
+                await self._prune_expired_sessions()
+                total_sessions = await self.redis.zcard("sessions")
+                total_messages = await self.redis.get("stats:msgs")
                 stats = {
-                    "total_sessions": len(self.sessions),
-                    "total_messages": sum(len(session["messages"]) for session in self.sessions.values()),
+                    "total_sessions": int(total_sessions or 0),
+                    "total_messages": int(total_messages or 0),
                     "active_since": datetime.now().isoformat(),
-                    "rag_system_status": "connected" if self.rag_system else "disconnected"
+                    "rag_system_status": "connected" if self.ready.is_set() else "disconnected"
                 }
                 
                 if self.rag_system:
@@ -330,7 +463,7 @@ class MentalHealthServer:
                 return stats
                 
             except Exception as e:
-                logger.error(f"Error getting stats: {str(e)}")
+                logger.error("Error getting stats: %s", e)
                 raise HTTPException(
                     status_code=500,
                     detail=f"Error getting statistics: {str(e)}"
@@ -342,10 +475,10 @@ class MentalHealthServer:
                 error=exc.detail,
                 timestamp=datetime.now().isoformat()
             )
-            logger.warning(f"HTTP Exception: {exc.status_code} - {exc.detail}")
-            return JSONResponse(
+            logger.warning("HTTP Exception: %s - %s", exc.status_code, exc.detail)
+            return ORJSONResponse(
                 status_code=exc.status_code,
-                content=error_response.dict()
+                content=error_response.model_dump(exclude_none=True)
             )
 
         @self.app.exception_handler(Exception)
@@ -355,22 +488,47 @@ class MentalHealthServer:
                 details=str(exc),
                 timestamp=datetime.now().isoformat()
             )
-            logger.error(f"Unhandled exception: {str(exc)}")
-            return JSONResponse(
+            logger.error("Unhandled exception: %s", exc)
+            return ORJSONResponse(
                 status_code=500,
-                content=error_response.dict()
+                content=error_response.model_dump(exclude_none=True)
             )
 
     def run(self, host: str = "0.0.0.0", port: int = 8000):
-        logger.info(f"Starting server on {host}:{port}")
+        logger.info("Starting server on %s:%s", host, port)
         uvicorn.run(
             self.app,
             host=host,
             port=port,
-            log_level="info",
+            loop="uvloop",
+            http="httptools",
+            log_level=LOG_LEVEL.lower(),
             access_log=True
         )
 
+def create_app() -> FastAPI:
+    return MentalHealthServer().app
+
+def run_workers(workers: int, host: str = "0.0.0.0", port: int = 8000):
+    # Seed once here so the workers, which share the ChromaDB directory, all
+    # find the seed already recorded instead of racing to write it
+    logger.info("Seeding knowledge base before starting %d workers", workers)
+    MentalHealthRAG(groq_api_key=os.getenv("GROQ_API_KEY")).seed_knowledge_documents(SAMPLE_DOCUMENTS)
+    
+    # Multiple workers need an import string so each process builds its own app
+    logger.info("Starting server on %s:%s with %d workers", host, port, workers)
+    uvicorn.run(
+        "server:create_app",
+        factory=True,
+        host=host,
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=workers,
+        log_level=LOG_LEVEL.lower(),
+        access_log=True
+    )
+
 def main():
     try:
         if not os.getenv("GROQ_API_KEY"):
@@ -384,15 +542,19 @@ def main():
         print("API documentation at http://localhost:8000/docs")
         print("Press Ctrl+C to stop the server")
         
-        server = MentalHealthServer()
-        server.run()
+        workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+        if workers > 1:
+            run_workers(workers)
+        else:
+            server = MentalHealthServer()
+            server.run()
         
     except KeyboardInterrupt:
         print("\nServer stopped by user")
         logger.info("Server stopped by user")
     except Exception as e:
         print(f"Failed to start server: {e}")
-        logger.error(f"Failed to start server: {e}")
+        logger.error("Failed to start server: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":